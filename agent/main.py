@@ -4,12 +4,27 @@ Phase 1: Read-only market discovery, analysis, and watchlisting.
 Phase 2: Trading (activates when POLYMARKET_PRIVATE_KEY is set).
 """
 
-import json
+import asyncio
+import base64
+import hashlib
+import importlib.util
+import itertools
+import logging
 import os
-from datetime import datetime, timezone
-
-import requests
-from exa_py import Exa
+import random
+import socket
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from functools import lru_cache
+
+import httpx
+import msgspec
+import numpy as np
+import orjson
+from cachetools import LRUCache, TTLCache
 from ag_ui_strands import (
     StrandsAgent,
     StrandsAgentConfig,
@@ -17,42 +32,134 @@ from ag_ui_strands import (
     create_strands_app,
 )
 from dotenv import load_dotenv
-from pydantic import BaseModel, Field
 from strands import Agent, tool
 from strands.models.anthropic import AnthropicModel
 
 load_dotenv(os.path.join(os.path.dirname(__file__), "..", ".env"))
 
 # ---------------------------------------------------------------------------
-# Datadog LLM Observability
+# Configuration
 # ---------------------------------------------------------------------------
 
-from ddtrace import tracer
-from ddtrace.llmobs import LLMObs
 
-# Disable default APM tracer (no local Datadog Agent needed)
-tracer.enabled = False
+@dataclass(frozen=True, slots=True)
+class Config:
+    """Environment settings, resolved once at import time."""
+
+    dd_api_key: str | None
+    dd_ml_app: str
+    dd_agentless: bool
+    exa_api_key: str | None
+    private_key: str | None
+    funder_address: str | None
+    creds_cache: str
+    minimax_api_key: str
+    agent_path: str
+    agent_port: int
+    debug: bool
+    reload: bool
+    workers: int
+
+
+CFG = Config(
+    dd_api_key=os.getenv("DD_API_KEY"),
+    dd_ml_app=os.getenv("DD_LLMOBS_ML_APP", "missfortune"),
+    dd_agentless=os.getenv("DD_LLMOBS_AGENTLESS_ENABLED", "1") == "1",
+    exa_api_key=os.getenv("EXA_API_KEY"),
+    private_key=os.getenv("POLYMARKET_PRIVATE_KEY"),
+    funder_address=os.getenv("POLYMARKET_FUNDER_ADDRESS"),
+    creds_cache=os.getenv(
+        "POLYMARKET_CREDS_CACHE",
+        os.path.expanduser("~/.cache/missfortune/creds.bin"),
+    ),
+    minimax_api_key=os.getenv("MINIMAX_API_KEY", ""),
+    agent_path=os.getenv("AGENT_PATH", "/"),
+    agent_port=int(os.getenv("AGENT_PORT", 8000)),
+    debug=os.getenv("AGENT_DEBUG", "0") == "1",
+    reload=os.getenv("AGENT_RELOAD", "0") == "1",
+    workers=int(os.getenv("AGENT_WORKERS", 1)),
+)
+
+LOG = logging.getLogger("missfortune")
+_log_handler = logging.StreamHandler()
+_log_handler.setFormatter(logging.Formatter("%(levelname)s [%(name)s] %(message)s"))
+LOG.addHandler(_log_handler)
+LOG.setLevel(logging.DEBUG if CFG.debug else logging.INFO)
 
-if os.getenv("DD_API_KEY"):
+# ---------------------------------------------------------------------------
+# Datadog LLM Observability
+# ---------------------------------------------------------------------------
+
+# ddtrace is only imported when enabled; it adds ~0.4s to cold start.
+if CFG.dd_api_key:
+    from ddtrace import tracer
+    from ddtrace.llmobs import LLMObs
+
+    # Disable default APM tracer (no local Datadog Agent needed)
+    tracer.enabled = False
     LLMObs.enable(
-        ml_app=os.getenv("DD_LLMOBS_ML_APP", "missfortune"),
-        agentless_enabled=os.getenv("DD_LLMOBS_AGENTLESS_ENABLED", "1") == "1",
+        ml_app=CFG.dd_ml_app,
+        agentless_enabled=CFG.dd_agentless,
         integrations_enabled=True,
     )
-    print("[Datadog] LLM Observability enabled — ml_app:", os.getenv("DD_LLMOBS_ML_APP", "missfortune"))
+    LOG.info("Datadog LLM Observability enabled — ml_app: %s", CFG.dd_ml_app)
 else:
-    print("[Datadog] LLM Observability disabled — set DD_API_KEY to enable")
+    LOG.info("Datadog LLM Observability disabled — set DD_API_KEY to enable")
+
+# ---------------------------------------------------------------------------
+# JSON helpers (orjson)
+# ---------------------------------------------------------------------------
+
+
+# Tool output goes straight into the model context, where indentation only
+# costs tokens. Pretty-print when AGENT_DEBUG is set.
+_JSON_INDENT = 2 if CFG.debug else None
+_ORJSON_OPTIONS = (
+    orjson.OPT_NON_STR_KEYS
+    | orjson.OPT_SERIALIZE_NUMPY
+    | (orjson.OPT_INDENT_2 if CFG.debug else 0)
+)
+
+
+def _dumps(obj, default=None) -> str:
+    """Serialize ``obj`` to a JSON string using orjson."""
+    return orjson.dumps(obj, default=default, option=_ORJSON_OPTIONS).decode()
+
+
+def _loads(data):
+    """Parse a JSON ``str``/``bytes`` payload using orjson."""
+    return orjson.loads(data)
+
+
+@lru_cache(maxsize=4096)
+def _parse_arr(raw: str) -> tuple:
+    """Decode one of Gamma's stringified JSON arrays, memoized on the raw string.
+
+    The same outcome/price/token strings recur across calls for a market, so
+    repeats skip decoding. Tuples keep the shared cache entries immutable.
+    """
+    return tuple(orjson.loads(raw)) if raw else ()
+
+
+def _parse_nested(value) -> tuple:
+    """Decode a Gamma array field that may arrive stringified or as a real list."""
+    if isinstance(value, str):
+        return _parse_arr(value)
+    return tuple(value) if value else ()
+
 
 # ---------------------------------------------------------------------------
 # State models
 # ---------------------------------------------------------------------------
 
 
-class Market(BaseModel):
+class Market(msgspec.Struct, frozen=True, kw_only=True):
+    """A watchlist market, as shared with the dashboard through AG-UI state."""
+
     id: str = ""
     question: str = ""
-    outcomes: list[str] = Field(default_factory=list)
-    outcome_prices: list[str] = Field(default_factory=list)
+    outcomes: tuple[str, ...] = ()
+    outcome_prices: tuple[str, ...] = ()
     volume: str = ""
     liquidity: str = ""
     end_date: str = ""
@@ -62,7 +169,126 @@ class Market(BaseModel):
     edge: float = 0.0
 
 
-class Position(BaseModel):
+# ---------------------------------------------------------------------------
+# Gamma wire models (msgspec)
+# ---------------------------------------------------------------------------
+
+
+class _GammaMarket(msgspec.Struct, rename="camel"):
+    """A Gamma market as it arrives on the wire; list fields are mostly JSON text."""
+
+    id: str = ""
+    question: str | None = None
+    outcomes: str | list[str] | None = None
+    outcome_prices: str | list[str] | None = None
+    volume: str | float | None = None
+    liquidity: str | float | None = None
+    end_date: str | None = None
+    volume24hr: str | float | None = None
+
+
+class _GammaMarketDetails(_GammaMarket, rename="camel"):
+    """A single Gamma market from /markets/{id}, with the trading fields."""
+
+    description: str | None = None
+    clob_token_ids: str | list[str] | None = None
+    neg_risk: bool | None = None
+
+
+class _GammaEvent(msgspec.Struct):
+    markets: list[_GammaMarket] | None = None
+
+
+class MarketFast(msgspec.Struct, frozen=True):
+    """Compact market row returned by the read-only search tools.
+
+    Structs share one field layout instead of carrying a hash table per row,
+    and encode straight to JSON without an intermediate dict.
+    """
+
+    id: str
+    question: str
+    outcomes: tuple[str, ...]
+    outcome_prices: tuple[str, ...]
+    volume: str
+    liquidity: str
+    end_date: str
+
+    @classmethod
+    def from_gamma(cls, mkt: _GammaMarket, **extra) -> "MarketFast":
+        return cls(
+            id=mkt.id,
+            question=mkt.question or "",
+            outcomes=_parse_nested(mkt.outcomes),
+            outcome_prices=_parse_nested(mkt.outcome_prices),
+            volume=str(mkt.volume) if mkt.volume is not None else "0",
+            liquidity=str(mkt.liquidity) if mkt.liquidity is not None else "0",
+            end_date=mkt.end_date or "",
+            **extra,
+        )
+
+
+class ActiveMarketRow(MarketFast, frozen=True):
+    """MarketFast plus 24h volume, returned by get_closing_soon_markets."""
+
+    volume_24h: str | float = "0"
+
+    @classmethod
+    def from_gamma(cls, mkt: _GammaMarket, **extra) -> "ActiveMarketRow":
+        volume_24h = mkt.volume24hr if mkt.volume24hr is not None else "0"
+        return super().from_gamma(mkt, volume_24h=volume_24h, **extra)
+
+
+class ClosingMarketRow(ActiveMarketRow, frozen=True):
+    """ActiveMarketRow plus hours until endDate, for the ``hours`` window."""
+
+    hours_remaining: float = 0.0
+
+
+class MarketDetailsRow(MarketFast, frozen=True):
+    """MarketFast plus the fields needed to trade, returned by get_market_details."""
+
+    description: str = ""
+    clob_token_ids: tuple[str, ...] = ()
+    neg_risk: bool = False
+
+    @classmethod
+    def from_details(cls, mkt: _GammaMarketDetails) -> "MarketDetailsRow":
+        return cls.from_gamma(
+            mkt,
+            description=(mkt.description or "")[:500],
+            clob_token_ids=_parse_nested(mkt.clob_token_ids),
+            neg_risk=bool(mkt.neg_risk),
+        )
+
+
+_MARKETS_DECODER = msgspec.json.Decoder(list[_GammaMarket])
+_DETAILS_DECODER = msgspec.json.Decoder(_GammaMarketDetails)
+_DETAILS_LIST_DECODER = msgspec.json.Decoder(list[_GammaMarketDetails])
+_EVENTS_DECODER = msgspec.json.Decoder(list[_GammaEvent])
+_MSGSPEC_ENCODER = msgspec.json.Encoder()
+
+
+def _tool_error(e: Exception) -> str:
+    """Error payload returned by a failed tool; must be called from ``except``.
+
+    The traceback is only logged at DEBUG so the production path stays a
+    plain serialisation.
+    """
+    if LOG.isEnabledFor(logging.DEBUG):
+        LOG.exception("Tool call failed")
+    return _dumps({"error": str(e)})
+
+
+def _encode_structs(obj) -> str:
+    """Serialize msgspec structs to a JSON string (indented when debugging)."""
+    data = _MSGSPEC_ENCODER.encode(obj)
+    if _JSON_INDENT:
+        data = msgspec.json.format(data, indent=_JSON_INDENT)
+    return data.decode()
+
+
+class Position(msgspec.Struct, frozen=True, kw_only=True):
     market_question: str = ""
     outcome: str = ""
     size: float = 0.0
@@ -70,9 +296,39 @@ class Position(BaseModel):
     current_price: float = 0.0
 
 
-class AgentState(BaseModel):
-    markets: list[Market] = Field(default_factory=list)
-    positions: list[Position] = Field(default_factory=list)
+@dataclass(slots=True)
+class PositionsSoA:
+    """Column-oriented view of positions so PnL is one vectorized expression."""
+
+    questions: list[str]
+    sizes: np.ndarray
+    avg_price: np.ndarray
+    current_price: np.ndarray
+
+    @classmethod
+    def from_positions(cls, positions: list[dict]) -> "PositionsSoA":
+        def column(key: str) -> np.ndarray:
+            return np.fromiter(
+                (float(p.get(key) or 0.0) for p in positions),
+                dtype=np.float64,
+                count=len(positions),
+            )
+
+        return cls(
+            questions=[p.get("market_question", "") for p in positions],
+            sizes=column("size"),
+            avg_price=column("avg_price"),
+            current_price=column("current_price"),
+        )
+
+    def pnl(self) -> np.ndarray:
+        """Unrealized PnL per position, in USDC."""
+        return (self.current_price - self.avg_price) * self.sizes
+
+
+class AgentState(msgspec.Struct, frozen=True, kw_only=True):
+    markets: list[Market] = msgspec.field(default_factory=list)
+    positions: list[Position] = msgspec.field(default_factory=list)
     last_action: str = ""
     wallet_balance: str = ""
     total_pnl: float = 0.0
@@ -85,64 +341,334 @@ class AgentState(BaseModel):
 GAMMA_API = "https://gamma-api.polymarket.com"
 CLOB_API = "https://clob.polymarket.com"
 
-exa_client = None
-if os.getenv("EXA_API_KEY"):
-    exa_client = Exa(api_key=os.getenv("EXA_API_KEY"))
+# Shared keep-alive client so Gamma/CLOB calls reuse pooled HTTP/2 connections.
+# Idle connections are kept well past httpx's 5s default because LLM turns
+# routinely take longer than that between tool calls; DNS and TLS are then
+# only paid when a connection is (re)opened.
+_http = httpx.AsyncClient(
+    timeout=15,
+    # Gamma event lists are large, highly compressible JSON; decoding br needs brotli
+    headers={"Accept-Encoding": "br, gzip"},
+    transport=httpx.AsyncHTTPTransport(
+        http2=True,
+        retries=1,
+        limits=httpx.Limits(
+            max_keepalive_connections=32, max_connections=64, keepalive_expiry=75
+        ),
+        socket_options=[(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)],
+    ),
+)
+
+# Short-lived response caches keyed on (url, params). Raw body bytes are
+# stored rather than parsed objects; books move fast, history barely at all.
+# Listings cover the Gamma market/event lists the agent re-scans each turn.
+_listing_cache = TTLCache(maxsize=256, ttl=30.0)
+_details_cache = TTLCache(maxsize=1024, ttl=30.0)
+_book_cache = TTLCache(maxsize=512, ttl=2.0)
+_history_cache = TTLCache(maxsize=256, ttl=60.0)
+
+
+# (ETag, body) of Gamma listings that outlive their TTL entry, so an expired
+# key can be revalidated with If-None-Match and a 304 reuses the old body.
+# Only listings are kept: they are re-scanned every turn and rarely change,
+# while books and histories would pin large bodies past their short TTLs.
+_etags = LRUCache(maxsize=_listing_cache.maxsize)
+
+# In-flight cache misses by key, so concurrent identical GETs share one request
+_inflight: dict[tuple, asyncio.Task] = {}
+
+
+@dataclass(slots=True)
+class TokenBucket:
+    """Token bucket refilling continuously at ``rate`` tokens per second."""
+
+    rate: float
+    capacity: float
+    tokens: float = field(init=False)
+    updated: float = field(init=False)
+
+    def __post_init__(self):
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    async def acquire(self) -> None:
+        """Take one token, sleeping until the bucket has refilled enough."""
+        while True:
+            now = time.monotonic()
+            self.tokens = min(
+                self.capacity, self.tokens + (now - self.updated) * self.rate
+            )
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+# Polymarket's published per-endpoint limits (requests per 10s), keyed on the
+# first path segment so /markets/{id} shares the /markets bucket.
+_RATE_LIMITS = {
+    "markets": TokenBucket(rate=30, capacity=300),
+    "events": TokenBucket(rate=50, capacity=500),
+    "book": TokenBucket(rate=150, capacity=1500),
+    "prices-history": TokenBucket(rate=100, capacity=1000),
+}
+
+# Rate limiting and gateway errors from Polymarket's edge are usually
+# transient; the transport's own retries only cover connection failures.
+_RETRY_STATUSES = frozenset({429, 502, 503, 504})
+_MAX_RETRIES = 2
+_RETRY_BACKOFF = 0.2
+_MAX_RETRY_AFTER = 10.0
+
+
+def _retry_delay(resp: httpx.Response, attempt: int) -> float:
+    """Seconds before the next attempt: Retry-After if sent, else jittered backoff."""
+    try:
+        return min(float(resp.headers["Retry-After"]), _MAX_RETRY_AFTER)
+    except (KeyError, ValueError):
+        return _RETRY_BACKOFF * 2**attempt * (0.5 + random.random())
+
+
+async def _get_with_retry(url: str, params: dict | None, headers: dict | None):
+    """GET within the endpoint's rate limit, retrying transient failures."""
+    bucket = _RATE_LIMITS.get(httpx.URL(url).path.split("/", 2)[1])
+    for attempt in range(_MAX_RETRIES + 1):
+        if bucket is not None:
+            await bucket.acquire()
+        resp = await _http.get(url, params=params, headers=headers)
+        if resp.status_code not in _RETRY_STATUSES or attempt == _MAX_RETRIES:
+            return resp
+        await asyncio.sleep(_retry_delay(resp, attempt))
+
+
+async def _fetch_into(
+    cache: TTLCache, key: tuple, url: str, params: dict | None
+) -> bytes:
+    known = _etags.get(key)
+    headers = {"If-None-Match": known[0]} if known else None
+    resp = await _get_with_retry(url, params, headers)
+    if known and resp.status_code == 304:
+        body = known[1]
+    else:
+        resp.raise_for_status()
+        body = resp.content
+        if cache is _listing_cache and (etag := resp.headers.get("ETag")):
+            _etags[key] = (etag, body)
+    cache[key] = body
+    return body
+
+
+def _cache_key(url: str, params: dict | None) -> tuple:
+    """Hashable key for a GET; list params (sent as repeated keys) become tuples."""
+    if not params:
+        return (url, ())
+    items = ((k, tuple(v) if isinstance(v, list) else v) for k, v in params.items())
+    return (url, tuple(sorted(items)))
+
+
+async def _cached_get(cache: TTLCache, url: str, params: dict | None = None) -> bytes:
+    """GET ``url`` and return the raw response body, serving repeats from ``cache``.
+
+    Concurrent misses for the same request are coalesced onto a single fetch.
+    """
+    key = _cache_key(url, params)
+    body = cache.get(key)
+    if body is not None:
+        return body
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_fetch_into(cache, key, url, params))
+        _inflight[key] = task
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+    # Shielded so one caller being cancelled does not abort the shared fetch
+    return await asyncio.shield(task)
+
+
+# Caps in-flight Polymarket requests from the batch tools (~15 concurrent)
+_fanout_semaphore = asyncio.Semaphore(15)
+
+
+# Exa results by query: (num_results requested, sources). Research on a topic
+# doesn't go stale within hours, and each search is billed.
+_exa_cache = TTLCache(maxsize=256, ttl=6 * 3600)
+
+
+async def _exa_search(exa_client, query: str, num_results: int) -> list[dict]:
+    """Run one Exa search and trim each hit to a 1500-character snippet.
+
+    Results are cached per query; a request for fewer results than a cached
+    search is served by slicing it.
+    """
+    cached = _exa_cache.get(query)
+    if cached is not None and cached[0] >= num_results:
+        return cached[1][:num_results]
+    result = await exa_client.search_and_contents(
+        query,
+        num_results=num_results,
+        text={"max_characters": 1500},
+        type="auto",
+    )
+    sources = [
+        {
+            "title": r.title,
+            "url": r.url,
+            "published_date": r.published_date,
+            "text": (r.text or "")[:1500],
+        }
+        for r in result.results
+    ]
+    _exa_cache[query] = (num_results, sources)
+    return sources
+
+
+@lru_cache(maxsize=1)
+def _exa_client():
+    """Exa client, built on first research call (exa_py is slow to import)."""
+    if not CFG.exa_api_key:
+        return None
+    from exa_py import AsyncExa
+
+    return AsyncExa(api_key=CFG.exa_api_key)
+
+
+# get_closing_soon_markets ranks a fixed candidate pool locally, so every
+# limit/sort_by combination is served from one cached Gamma listing.
+_LISTING_POOL = 100
+_RANK_FIELDS = {
+    "volume_24h": "volume24hr",
+    "volume": "volume",
+    "liquidity": "liquidity",
+}
+
+
+def _as_float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _rank_column(markets: list[_GammaMarket], attr: str) -> np.ndarray:
+    """Pack one numeric Gamma field into a contiguous float64 column."""
+    return np.fromiter(
+        (_as_float(getattr(m, attr)) for m in markets),
+        dtype=np.float64,
+        count=len(markets),
+    )
+
+
+def _end_dates(markets: list[_GammaMarket]) -> np.ndarray:
+    """Gamma endDate strings as UTC datetime64; missing or malformed are NaT."""
+    # numpy parses ISO 8601 natively but rejects (warns on) a "Z" suffix
+    raw = [(m.end_date or "NaT").removesuffix("Z") for m in markets]
+    try:
+        return np.array(raw, dtype="datetime64[s]")
+    except ValueError:
+        return np.array([_datetime64_or_nat(r) for r in raw], dtype="datetime64[s]")
+
+
+def _datetime64_or_nat(value: str) -> np.datetime64:
+    try:
+        return np.datetime64(value, "s")
+    except ValueError:
+        return np.datetime64("NaT", "s")
+
+
+def _top_k(values: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the ``k`` largest values, largest first."""
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    if k < len(values):
+        idx = np.argpartition(values, -k)[-k:]
+    else:
+        idx = np.arange(len(values))
+    return idx[np.argsort(-values[idx], kind="stable")]
 
 
 @tool
-def get_closing_soon_markets(limit: int = 15):
+async def get_closing_soon_markets(
+    limit: int = 15, sort_by: str = "volume_24h", hours: float | None = None
+):
     """Fetch active Polymarket prediction markets sorted by most recent activity.
 
-    Note: Polymarket's endDate field is often inaccurate, so this returns
-    the most actively traded open markets instead of filtering by end date.
-    The agent should look at market questions to identify time-sensitive ones.
+    Note: Polymarket's endDate field is often inaccurate, so by default this
+    returns the most actively traded open markets instead of filtering by end
+    date. The agent should look at market questions to identify time-sensitive
+    ones.
 
     Args:
         limit: Maximum number of results to return (default 15).
+        sort_by: Ranking field: "volume_24h" (default), "volume" or "liquidity".
+            Candidates are the most active markets by 24h volume. Ignored
+            when ``hours`` is set.
+        hours: Optional window; if set, returns the markets whose endDate falls
+            within the next ``hours`` hours, soonest first, with hours_remaining.
 
     Returns:
         JSON string of active markets with outcomes and current prices.
     """
+    attr = _RANK_FIELDS.get(sort_by)
+    if attr is None:
+        return _dumps({"error": f"sort_by must be one of {sorted(_RANK_FIELDS)}"})
     try:
-        resp = requests.get(
+        if hours is not None:
+            return await _closing_within(hours, limit)
+        body = await _cached_get(
+            _listing_cache,
             f"{GAMMA_API}/markets",
             params={
                 "active": True,
                 "closed": False,
-                "limit": limit,
+                "limit": max(limit, _LISTING_POOL),
                 "order": "volume24hr",
                 "ascending": False,
             },
-            timeout=15,
         )
-        resp.raise_for_status()
-        all_markets = resp.json()
-
-        results = []
-        for mkt in all_markets:
-            results.append(
-                {
-                    "id": mkt.get("id", ""),
-                    "question": mkt.get("question", ""),
-                    "outcomes": json.loads(mkt.get("outcomes", "[]")),
-                    "outcome_prices": json.loads(
-                        mkt.get("outcomePrices", "[]")
-                    ),
-                    "volume": mkt.get("volume", "0"),
-                    "volume_24h": mkt.get("volume24hr", "0"),
-                    "liquidity": mkt.get("liquidity", "0"),
-                    "end_date": mkt.get("endDate", ""),
-                }
-            )
-
-        return json.dumps(results[:limit], indent=2)
+        all_markets = _MARKETS_DECODER.decode(body)
+        # Rank on the packed column, then parse outcome arrays only for winners
+        top = _top_k(_rank_column(all_markets, attr), limit)
+        rows = [ActiveMarketRow.from_gamma(all_markets[i]) for i in top.tolist()]
+        return _encode_structs(rows)
     except Exception as e:
-        return json.dumps({"error": str(e)})
+        return _tool_error(e)
+
+
+async def _closing_within(hours: float, limit: int) -> str:
+    """Markets whose endDate falls within the next ``hours`` hours, soonest first."""
+    # Gamma filters the window itself, so quiet markets closing soon are
+    # candidates too. Bounds are floored to the minute to keep the cache key
+    # stable between calls; the exact window is applied locally.
+    start = datetime.now(timezone.utc).replace(second=0, microsecond=0)
+    end = start + timedelta(hours=hours, minutes=1)
+    body = await _cached_get(
+        _listing_cache,
+        f"{GAMMA_API}/markets",
+        params={
+            "active": True,
+            "closed": False,
+            "limit": max(limit, _LISTING_POOL),
+            "order": "endDate",
+            "ascending": True,
+            "end_date_min": start.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "end_date_max": end.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        },
+    )
+    markets = _MARKETS_DECODER.decode(body)
+    # NaT end dates compare False, so they drop out of the window
+    now = np.datetime64("now", "s")
+    hours_left = (_end_dates(markets) - now) / np.timedelta64(1, "h")
+    window = np.flatnonzero((hours_left > 0) & (hours_left <= hours))
+    top = window[np.argsort(hours_left[window], kind="stable")[:limit]]
+    rows = [
+        ClosingMarketRow.from_gamma(markets[i], hours_remaining=round(h, 1))
+        for i, h in zip(top.tolist(), hours_left[top].tolist())
+    ]
+    return _encode_structs(rows)
 
 
 @tool
-def exa_research(query: str, num_results: int = 5):
+async def exa_research(query: str, num_results: int = 5):
     """Research a topic using Exa AI search to find relevant news, analysis, and context.
 
     Use this to gather background information on a Polymarket bet topic so you
@@ -155,32 +681,58 @@ def exa_research(query: str, num_results: int = 5):
     Returns:
         JSON string with titles, URLs, and text snippets from relevant sources.
     """
+    exa_client = _exa_client()
     if exa_client is None:
-        return json.dumps({"error": "Exa not configured. Set EXA_API_KEY."})
+        return _dumps({"error": "Exa not configured. Set EXA_API_KEY."})
     try:
-        result = exa_client.search_and_contents(
-            query,
-            num_results=num_results,
-            text={"max_characters": 1500},
-            type="auto",
-        )
-        sources = []
-        for r in result.results:
-            sources.append(
-                {
-                    "title": r.title,
-                    "url": r.url,
-                    "published_date": r.published_date,
-                    "text": (r.text or "")[:1500],
-                }
-            )
-        return json.dumps(sources, indent=2)
+        return _dumps(await _exa_search(exa_client, query, num_results))
     except Exception as e:
-        return json.dumps({"error": str(e)})
+        return _tool_error(e)
+
+
+# Upper bound on queries per exa_research_batch call
+_EXA_BATCH_MAX = 10
 
 
 @tool
-def search_markets(query: str, limit: int = 10):
+async def exa_research_batch(queries: list[str], num_results: int = 5):
+    """Research several topics at once using Exa AI search.
+
+    Prefer this over repeated exa_research calls when researching a shortlist
+    of markets; the searches run concurrently.
+
+    Args:
+        queries: Up to 10 research queries, e.g. one per market.
+        num_results: Number of search results to return per query (default 5).
+
+    Returns:
+        JSON object mapping each query to its sources, or to an error.
+    """
+    exa_client = _exa_client()
+    if exa_client is None:
+        return _dumps({"error": "Exa not configured. Set EXA_API_KEY."})
+    queries = queries[:_EXA_BATCH_MAX]
+    results = await asyncio.gather(
+        *(_exa_search(exa_client, q, num_results) for q in queries),
+        return_exceptions=True,
+    )
+    return _dumps(
+        {
+            q: {"error": str(r)} if isinstance(r, Exception) else r
+            for q, r in zip(queries, results)
+        }
+    )
+
+
+def _iter_event_markets(events: list[_GammaEvent]):
+    """Lazily yield a MarketFast row for each market across ``events``."""
+    for event in events:
+        for mkt in event.markets or ():
+            yield MarketFast.from_gamma(mkt)
+
+
+@tool
+async def search_markets(query: str, limit: int = 10):
     """Search Polymarket for prediction markets matching a query.
 
     Args:
@@ -191,37 +743,77 @@ def search_markets(query: str, limit: int = 10):
         JSON string of matching markets with outcomes and prices.
     """
     try:
-        resp = requests.get(
+        body = await _cached_get(
+            _listing_cache,
             f"{GAMMA_API}/events",
             params={"title": query, "limit": limit, "active": True, "closed": False},
-            timeout=15,
         )
-        resp.raise_for_status()
-        events = resp.json()
-
-        results = []
-        for event in events:
-            for mkt in event.get("markets", []):
-                results.append(
-                    {
-                        "id": mkt.get("id", ""),
-                        "question": mkt.get("question", ""),
-                        "outcomes": json.loads(mkt.get("outcomes", "[]")),
-                        "outcome_prices": json.loads(
-                            mkt.get("outcomePrices", "[]")
-                        ),
-                        "volume": mkt.get("volume", "0"),
-                        "liquidity": mkt.get("liquidity", "0"),
-                        "end_date": mkt.get("endDate", ""),
-                    }
-                )
-        return json.dumps(results[:limit], indent=2)
+        events = _EVENTS_DECODER.decode(body)
+
+        rows = list(itertools.islice(_iter_event_markets(events), limit))
+        return _encode_structs(rows)
     except Exception as e:
-        return json.dumps({"error": str(e)})
+        return _tool_error(e)
+
+
+async def _gather_by_id(fetch, ids: list[str]) -> dict:
+    """Run ``fetch`` for every ID concurrently, keyed by ID.
+
+    Failures are reported per ID instead of failing the whole batch.
+    """
+
+    async def bounded(item_id: str):
+        async with _fanout_semaphore:
+            return await fetch(item_id)
+
+    results = await asyncio.gather(*(bounded(i) for i in ids), return_exceptions=True)
+    return {
+        i: {"error": str(r)} if isinstance(r, Exception) else r
+        for i, r in zip(ids, results)
+    }
+
+
+async def _fetch_market_details(market_id: str) -> MarketDetailsRow:
+    body = await _cached_get(_details_cache, f"{GAMMA_API}/markets/{market_id}")
+    return MarketDetailsRow.from_details(_DETAILS_DECODER.decode(body))
+
+
+# IDs per /markets?id=... request; larger batches are split and fetched together
+_DETAILS_BATCH = 50
+
+
+async def _fetch_market_details_batch(market_ids: list[str]) -> dict:
+    """Fetch details for ``market_ids`` with one Gamma request per 50 IDs.
+
+    IDs Gamma does not return, and chunks whose request fails, map to an error.
+    """
+    unique = sorted(set(market_ids))
+    chunks = [
+        unique[i : i + _DETAILS_BATCH] for i in range(0, len(unique), _DETAILS_BATCH)
+    ]
+
+    async def fetch(ids: list[str]) -> list[_GammaMarketDetails]:
+        body = await _cached_get(
+            _details_cache,
+            f"{GAMMA_API}/markets",
+            params={"id": ids, "limit": len(ids)},
+        )
+        return _DETAILS_LIST_DECODER.decode(body)
+
+    results = await asyncio.gather(*map(fetch, chunks), return_exceptions=True)
+    found: dict = {}
+    for ids, result in zip(chunks, results):
+        if isinstance(result, Exception):
+            found.update(dict.fromkeys(ids, {"error": str(result)}))
+            continue
+        for mkt in result:
+            found[mkt.id] = MarketDetailsRow.from_details(mkt)
+    missing = {"error": "Market not found"}
+    return {i: found.get(i, missing) for i in market_ids}
 
 
 @tool
-def get_market_details(market_id: str):
+async def get_market_details(market_id: str):
     """Get full details for a specific Polymarket market.
 
     Args:
@@ -231,30 +823,101 @@ def get_market_details(market_id: str):
         JSON string with full market info including clobTokenIds and tick size.
     """
     try:
-        resp = requests.get(f"{GAMMA_API}/markets/{market_id}", timeout=15)
-        resp.raise_for_status()
-        mkt = resp.json()
-        return json.dumps(
-            {
-                "id": mkt.get("id", ""),
-                "question": mkt.get("question", ""),
-                "description": mkt.get("description", "")[:500],
-                "outcomes": json.loads(mkt.get("outcomes", "[]")),
-                "outcome_prices": json.loads(mkt.get("outcomePrices", "[]")),
-                "volume": mkt.get("volume", "0"),
-                "liquidity": mkt.get("liquidity", "0"),
-                "end_date": mkt.get("endDate", ""),
-                "clob_token_ids": json.loads(mkt.get("clobTokenIds", "[]")),
-                "neg_risk": mkt.get("negRisk", False),
-            },
-            indent=2,
-        )
+        return _encode_structs(await _fetch_market_details(market_id))
+    except Exception as e:
+        return _tool_error(e)
+
+
+@tool
+async def get_market_details_batch(market_ids: list[str]):
+    """Get full details for several Polymarket markets in one call.
+
+    Prefer this over repeated get_market_details calls when researching a
+    shortlist of markets: collect the candidate IDs first, then make one call.
+    Up to 50 markets are fetched per upstream request.
+
+    Args:
+        market_ids: The market IDs to look up.
+
+    Returns:
+        JSON object mapping each market ID to its details, or to an error.
+    """
+    try:
+        return _encode_structs(await _fetch_market_details_batch(market_ids))
     except Exception as e:
-        return json.dumps({"error": str(e)})
+        return _tool_error(e)
+
+
+async def _fetch_order_book_body(token_id: str) -> bytes:
+    return await _cached_get(
+        _book_cache, f"{CLOB_API}/book", params={"token_id": token_id}
+    )
+
+
+async def _fetch_order_book(token_id: str) -> msgspec.Raw:
+    """Order book as upstream JSON, embedded verbatim by ``_encode_structs``."""
+    return msgspec.Raw(await _fetch_order_book_body(token_id))
+
+
+# "interval=all" returns thousands of points; the agent only needs the shape
+_HISTORY_MAX_POINTS = 10
+_DAY = 86_400
+
+
+def _pct_change(ts: np.ndarray, prices: np.ndarray, seconds: int) -> float | None:
+    """Percent change of the last price vs the last price ``seconds`` earlier."""
+    i = np.searchsorted(ts, ts[-1] - seconds, side="right") - 1
+    if i < 0 or prices[i] <= 0:
+        return None
+    return round(float(prices[-1] / prices[i] - 1) * 100, 2)
+
+
+def _summarize_history(data: dict) -> dict:
+    """Summarize CLOB price history and keep a few sample points.
+
+    Returns price statistics (first/last/min/max/mean/median/std, 24h and 7d
+    percent change, 7d volatility of point-to-point moves) plus at most
+    ``_HISTORY_MAX_POINTS`` evenly spaced points, always including the latest.
+    """
+    points = data.get("history") or []
+    if not points:
+        return {"summary": {"count": 0}, "history": []}
+    n = len(points)
+    ts = np.fromiter((p["t"] for p in points), dtype=np.int64, count=n)
+    prices = np.fromiter((p["p"] for p in points), dtype=np.float64, count=n)
+    # Evenly spaced indices from the first point to the latest, inclusive
+    m = min(n, _HISTORY_MAX_POINTS)
+    sampled = [points[i] for i in np.arange(m) * (n - 1) // max(m - 1, 1)]
+    week = prices[ts >= ts[-1] - 7 * _DAY]
+    summary = {
+        "count": n,
+        "start": int(ts[0]),
+        "end": int(ts[-1]),
+        "first": float(prices[0]),
+        "last": float(prices[-1]),
+        "min": float(prices.min()),
+        "max": float(prices.max()),
+        "mean": round(float(prices.mean()), 4),
+        "median": float(np.median(prices)),
+        "std": round(float(prices.std()), 4),
+        "pct_24h": _pct_change(ts, prices, _DAY),
+        "pct_7d": _pct_change(ts, prices, 7 * _DAY),
+        "volatility_7d": round(float(np.diff(week).std()), 4) if len(week) > 1 else 0.0,
+    }
+    return {"summary": summary, "history": sampled}
+
+
+async def _fetch_price_history(token_id: str):
+    body = await _cached_get(
+        _history_cache,
+        f"{CLOB_API}/prices-history",
+        params={"market": token_id, "interval": "all"},
+    )
+    return _summarize_history(_loads(body))
 
 
 @tool
-def get_order_book(token_id: str):
+async def get_order_book(token_id: str):
     """Get the order book (bid/ask depth) for a market outcome token.
 
     Args:
@@ -264,78 +927,261 @@ def get_order_book(token_id: str):
         JSON string with bids and asks arrays.
     """
     try:
-        resp = requests.get(
-            f"{CLOB_API}/book", params={"token_id": token_id}, timeout=15
-        )
-        resp.raise_for_status()
-        book = resp.json()
-        return json.dumps(book, indent=2)
+        # Upstream bytes are already the JSON we want; skip parse + re-encode
+        return (await _fetch_order_book_body(token_id)).decode()
+    except Exception as e:
+        return _tool_error(e)
+
+
+@tool
+async def get_order_books(token_ids: list[str]):
+    """Get order books for several outcome tokens in one call.
+
+    Prefer this over repeated get_order_book calls when comparing markets.
+
+    Args:
+        token_ids: CLOB token IDs to fetch books for.
+
+    Returns:
+        JSON object mapping each token ID to its bids/asks, or to an error.
+    """
+    try:
+        return _encode_structs(await _gather_by_id(_fetch_order_book, token_ids))
     except Exception as e:
-        return json.dumps({"error": str(e)})
+        return _tool_error(e)
 
 
 @tool
-def get_price_history(token_id: str):
+async def get_price_history(token_id: str):
     """Get historical price data for a market outcome token.
 
     Args:
         token_id: The CLOB token ID for the outcome.
 
     Returns:
-        JSON string with historical price points.
+        JSON string with price summary statistics (including 24h/7d change
+        and 7d volatility) and up to 10 evenly spaced historical price points.
+    """
+    try:
+        return _dumps(await _fetch_price_history(token_id))
+    except Exception as e:
+        return _tool_error(e)
+
+
+@tool
+async def get_price_histories(token_ids: list[str]):
+    """Get historical price data for several outcome tokens in one call.
+
+    Prefer this over repeated get_price_history calls when comparing markets.
+
+    Args:
+        token_ids: CLOB token IDs to fetch history for.
+
+    Returns:
+        JSON object mapping each token ID to its summarized price history
+        (as in get_price_history), or to an error.
     """
     try:
-        resp = requests.get(
-            f"{CLOB_API}/prices-history",
-            params={"market": token_id, "interval": "all"},
-            timeout=15,
+        return _dumps(await _gather_by_id(_fetch_price_history, token_ids))
+    except Exception as e:
+        return _tool_error(e)
+
+
+# Upper bound on markets per research_and_quote call; each one fans out to an
+# Exa search plus a book and history fetch per outcome token
+_QUOTE_BATCH_MAX = 10
+
+
+@tool
+async def research_and_quote(market_ids: list[str], num_results: int = 3):
+    """Research and price several markets in one call.
+
+    For each market this fetches its details, an Exa search on its question,
+    and the order book and price history of every outcome token, all
+    concurrently. Prefer this when evaluating more than two markets.
+
+    Args:
+        market_ids: Up to 10 market IDs to evaluate.
+        num_results: Exa results per market (default 3).
+
+    Returns:
+        JSON object mapping each market ID to its market details, research,
+        books and history (keyed by token ID), or to an error.
+    """
+    exa_client = _exa_client()
+
+    async def research(question: str):
+        if exa_client is None:
+            return {"error": "Exa not configured. Set EXA_API_KEY."}
+        try:
+            return await _exa_search(exa_client, question, num_results)
+        except Exception as e:
+            return {"error": str(e)}
+
+    async def evaluate(market: MarketDetailsRow) -> dict:
+        tokens = list(market.clob_token_ids)
+        sources, books, history = await asyncio.gather(
+            research(market.question),
+            _gather_by_id(_fetch_order_book, tokens),
+            _gather_by_id(_fetch_price_history, tokens),
         )
-        resp.raise_for_status()
-        history = resp.json()
-        return json.dumps(history, indent=2)
+        return {
+            "market": market,
+            "research": sources,
+            "books": books,
+            "history": history,
+        }
+
+    try:
+        details = await _fetch_market_details_batch(market_ids[:_QUOTE_BATCH_MAX])
+        ids = [i for i, d in details.items() if isinstance(d, MarketDetailsRow)]
+        results = await asyncio.gather(*(evaluate(details[i]) for i in ids))
+        details.update(zip(ids, results))
+        return _encode_structs(details)
     except Exception as e:
-        return json.dumps({"error": str(e)})
+        return _tool_error(e)
 
 
 # USDC contract on Polygon
 _USDC_POLYGON = "0x2791Bca1f2de4661ED88A30C99A7a9449Aa84174"
 _POLYGON_RPC = "https://polygon-rpc.com"
+# ERC-20 balanceOf(address) and decimals() function selectors
+_BALANCE_OF_SELECTOR = "0x70a08231"
+_DECIMALS_SELECTOR = "0x313ce567"
+# Public RPCs cap batch sizes; each token costs two calls
+_TOKEN_BATCH_MAX = 20
+
+
+@lru_cache(maxsize=1)
+def _wallet_calldata() -> tuple[str, str]:
+    """Wallet address and its ``balanceOf`` calldata.
+
+    The key is fixed per process, so the ECDSA key derivation and calldata
+    encoding only ever run once.
+    """
+    from eth_account import Account
+
+    address = Account.from_key(CFG.private_key).address
+    return address, f"{_BALANCE_OF_SELECTOR}{address[2:].lower():0>64}"
+
+
+@lru_cache(maxsize=1)
+def _balance_call() -> tuple[str, bytes]:
+    """Wallet address and pre-serialized USDC ``balanceOf`` eth_call body."""
+    address, data = _wallet_calldata()
+    body = orjson.dumps(
+        {
+            "jsonrpc": "2.0",
+            "method": "eth_call",
+            "params": [{"to": _USDC_POLYGON, "data": data}, "latest"],
+            "id": 1,
+        }
+    )
+    return address, body
+
+
+def _decode_uint(result: str | None) -> int:
+    """Decode a 32-byte ABI uint from an eth_call hex result."""
+    return int.from_bytes(bytes.fromhex((result or "0x")[2:].rjust(64, "0")), "big")
+
+
+async def _rpc_batch(calls: list[dict]) -> list[dict]:
+    """Send ``eth_call`` requests as a single JSON-RPC batch.
+
+    Args:
+        calls: Call objects (``{"to": ..., "data": ...}``) to run at "latest".
+
+    Returns:
+        The JSON-RPC replies in the same order as ``calls``. Replies may carry
+        an ``error`` instead of a ``result``; missing replies are empty dicts.
+    """
+    body = orjson.dumps(
+        [
+            {"jsonrpc": "2.0", "method": "eth_call", "params": [c, "latest"], "id": i}
+            for i, c in enumerate(calls)
+        ]
+    )
+    resp = await _http.post(
+        _POLYGON_RPC,
+        content=body,
+        headers={"Content-Type": "application/json"},
+        timeout=10,
+    )
+    resp.raise_for_status()
+    replies = _loads(resp.content)
+    if not isinstance(replies, list):
+        # Batch rejected as a whole, e.g. rate limited or too large
+        raise RuntimeError((replies.get("error") or {}).get("message", "RPC error"))
+    by_id = {r.get("id"): r for r in replies}
+    return [by_id.get(i, {}) for i in range(len(calls))]
 
 
 @tool
-def get_wallet_balance():
+async def get_wallet_balance():
     """Get the USDC balance of the configured Polymarket wallet on Polygon.
 
     Returns:
         JSON string with wallet address and USDC balance, or an error if no wallet is configured.
     """
-    pk = os.getenv("POLYMARKET_PRIVATE_KEY")
-    if not pk:
-        return json.dumps({"balance": "0", "address": "", "error": "No wallet configured"})
+    if not CFG.private_key:
+        return _dumps({"balance": "0", "address": "", "error": "No wallet configured"})
     try:
-        from eth_account import Account
-
-        address = Account.from_key(pk).address
-        # ERC-20 balanceOf(address) selector = 0x70a08231
-        data = "0x70a08231" + address[2:].lower().zfill(64)
-        resp = requests.post(
+        address, body = _balance_call()
+        resp = await _http.post(
             _POLYGON_RPC,
-            json={
-                "jsonrpc": "2.0",
-                "method": "eth_call",
-                "params": [{"to": _USDC_POLYGON, "data": data}, "latest"],
-                "id": 1,
-            },
+            content=body,
+            headers={"Content-Type": "application/json"},
             timeout=10,
         )
         resp.raise_for_status()
-        result = resp.json().get("result", "0x0")
         # USDC has 6 decimals
-        balance_raw = int(result, 16)
-        balance = balance_raw / 1e6
-        return json.dumps({"address": address, "balance": f"{balance:.2f}"})
+        balance_raw = _decode_uint(_loads(resp.content).get("result"))
+        return _dumps({"address": address, "balance": f"{balance_raw / 1e6:.2f}"})
+    except Exception as e:
+        return _tool_error(e)
+
+
+@tool
+async def get_token_balances_batch(token_addresses: list[str]):
+    """Get the wallet's balances of several ERC-20 tokens on Polygon in one call.
+
+    All balanceOf and decimals lookups go out as a single JSON-RPC batch.
+
+    Args:
+        token_addresses: Up to 20 ERC-20 contract addresses on Polygon.
+
+    Returns:
+        JSON object mapping each token address to its balance (raw units,
+        decimals and human-readable amount), or to an error.
+    """
+    if not CFG.private_key:
+        return _dumps({"error": "No wallet configured"})
+    try:
+        _, data = _wallet_calldata()
+        tokens = token_addresses[:_TOKEN_BATCH_MAX]
+        calls = []
+        for token in tokens:
+            calls.append({"to": token, "data": data})
+            calls.append({"to": token, "data": _DECIMALS_SELECTOR})
+        replies = await _rpc_batch(calls)
+        balances = {}
+        for i, token in enumerate(tokens):
+            balance, decimals = replies[2 * i], replies[2 * i + 1]
+            error = balance.get("error") or decimals.get("error")
+            if error or "result" not in balance or "result" not in decimals:
+                message = error.get("message") if error else "No RPC result"
+                balances[token] = {"error": message}
+                continue
+            raw = _decode_uint(balance["result"])
+            places = _decode_uint(decimals["result"])
+            balances[token] = {
+                "raw": str(raw),
+                "decimals": places,
+                "balance": f"{Decimal(raw).scaleb(-places).normalize():f}",
+            }
+        return _dumps(balances)
     except Exception as e:
-        return json.dumps({"error": str(e)})
+        return _tool_error(e)
 
 
 @tool
@@ -355,7 +1201,8 @@ def update_watchlist(
                  After research, also include: recommendation (e.g. "BUY Yes"),
                  confidence (0.0-1.0), reasoning (1-2 sentence summary),
                  edge (estimated true probability minus market price, e.g. 0.12).
-        positions: Optional list of position dicts.
+        positions: Optional list of position dicts, each with keys:
+                   market_question, outcome, size, avg_price, current_price.
         last_action: Description of what you just did.
         wallet_balance: USDC balance string from get_wallet_balance (e.g. "150.00").
 
@@ -369,47 +1216,161 @@ def update_watchlist(
 # Phase 2: Trading tools (require POLYMARKET_PRIVATE_KEY)
 # ---------------------------------------------------------------------------
 
-clob_client = None
-if os.getenv("POLYMARKET_PRIVATE_KEY"):
+_TRADING_NOT_CONFIGURED = "Trading not configured. Set POLYMARKET_PRIVATE_KEY."
+
+# Built on first trade tool call: deriving API creds signs a message and
+# round-trips to the CLOB, which should not block import or reloads.
+_clob_client = None
+_clob_lock = asyncio.Lock()
+
+# py_clob_client's BUY/SELL constants, bound alongside the client: importing
+# them at module level would load the whole SDK (~1.5s) at startup.
+_ORDER_SIDES: dict[str, str] = {}
+
+
+def _creds_cipher():
+    """Fernet cipher keyed off the wallet key, so the cache is per-wallet."""
+    from cryptography.fernet import Fernet
+
+    digest = hashlib.sha256(b"missfortune-clob-creds:" + CFG.private_key.encode())
+    return Fernet(base64.urlsafe_b64encode(digest.digest()))
+
+
+def _load_cached_creds():
+    """Return CLOB API creds saved by a previous run, or None."""
+    from cryptography.fernet import InvalidToken
+    from py_clob_client.clob_types import ApiCreds
+
+    if not CFG.creds_cache:
+        return None
     try:
-        from py_clob_client.client import ClobClient
+        with open(CFG.creds_cache, "rb") as f:
+            raw = _creds_cipher().decrypt(f.read())
+        return ApiCreds(**orjson.loads(raw))
+    except (OSError, InvalidToken, TypeError, orjson.JSONDecodeError):
+        # Missing, from another wallet, or corrupt: derive fresh creds
+        return None
 
-        _temp = ClobClient(
-            "https://clob.polymarket.com",
-            key=os.getenv("POLYMARKET_PRIVATE_KEY"),
-            chain_id=137,
-        )
-        _creds = _temp.create_or_derive_api_creds()
-        clob_client = ClobClient(
-            "https://clob.polymarket.com",
-            key=os.getenv("POLYMARKET_PRIVATE_KEY"),
-            chain_id=137,
-            creds=_creds,
-            signature_type=0,
-            funder=os.getenv("POLYMARKET_FUNDER_ADDRESS"),
+
+def _store_creds(creds) -> None:
+    """Encrypt and persist CLOB API creds; failures only cost a re-derive."""
+    if not CFG.creds_cache:
+        return
+    token = _creds_cipher().encrypt(
+        orjson.dumps(
+            {
+                "api_key": creds.api_key,
+                "api_secret": creds.api_secret,
+                "api_passphrase": creds.api_passphrase,
+            }
         )
+    )
+    try:
+        os.makedirs(os.path.dirname(CFG.creds_cache), mode=0o700, exist_ok=True)
+        fd = os.open(CFG.creds_cache, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(token)
+    except OSError as e:
+        LOG.warning("Could not cache trading credentials: %s", e)
+
+
+def _build_clob_client():
+    from py_clob_client.client import ClobClient
+    from py_clob_client.order_builder.constants import BUY, SELL
+
+    _ORDER_SIDES.update(BUY=BUY, SELL=SELL)
+
+    # Deriving creds signs an EIP-712 message and round-trips to the CLOB;
+    # reuse the encrypted copy from the last run when there is one.
+    creds = _load_cached_creds()
+    if creds is None:
+        temp = ClobClient(CLOB_API, key=CFG.private_key, chain_id=137)
+        creds = temp.create_or_derive_api_creds()
+        # py_clob_client swallows API errors here and returns None
+        if creds is None:
+            raise RuntimeError("Could not create or derive CLOB API creds")
+        _store_creds(creds)
+    return ClobClient(
+        CLOB_API,
+        key=CFG.private_key,
+        chain_id=137,
+        creds=creds,
+        signature_type=0,
+        funder=CFG.funder_address,
+    )
+
+
+async def _get_clob():
+    """Return the trading client, or None if trading is unavailable.
+
+    A failed initialization is retried on the next call.
+    """
+    global _clob_client
+    if _clob_client is None and CFG.private_key:
+        async with _clob_lock:
+            if _clob_client is None:
+                try:
+                    _clob_client = await asyncio.to_thread(_build_clob_client)
+                except Exception as e:
+                    LOG.warning("Could not initialize trading client: %s", e)
+    return _clob_client
+
+
+def _drop_clob_client(stale) -> None:
+    """Forget ``stale`` and its cached creds so the next call re-derives them.
+
+    A no-op when another call has already replaced the client.
+    """
+    global _clob_client
+    if _clob_client is not stale:
+        return
+    _clob_client = None
+    if CFG.creds_cache:
+        try:
+            os.remove(CFG.creds_cache)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            LOG.warning("Could not remove cached trading credentials: %s", e)
+
+
+async def _clob_call(clob, method: str, *args):
+    """Run a trading client method off the event loop.
+
+    If the CLOB rejects the API creds (revoked or rotated since they were
+    cached), they are re-derived and the call is retried once.
+    """
+    try:
+        return await asyncio.to_thread(getattr(clob, method), *args)
     except Exception as e:
-        print(f"Warning: Could not initialize trading client: {e}")
+        if getattr(e, "status_code", None) != 401:
+            raise
+    _drop_clob_client(clob)
+    clob = await _get_clob()
+    if clob is None:
+        raise RuntimeError("Trading credentials were rejected and could not be renewed")
+    return await asyncio.to_thread(getattr(clob, method), *args)
 
 
 @tool
-def get_positions():
+async def get_positions():
     """Fetch current positions for the configured wallet.
 
     Returns:
         JSON string of current positions or error message.
     """
-    if clob_client is None:
-        return "Trading not configured. Set POLYMARKET_PRIVATE_KEY."
+    clob = await _get_clob()
+    if clob is None:
+        return _TRADING_NOT_CONFIGURED
     try:
-        positions = clob_client.get_positions()
-        return json.dumps(positions, indent=2, default=str)
+        positions = await _clob_call(clob, "get_positions")
+        return _dumps(positions, default=str)
     except Exception as e:
-        return json.dumps({"error": str(e)})
+        return _tool_error(e)
 
 
 @tool
-def place_bet(token_id: str, side: str, price: float, size: float):
+async def place_bet(token_id: str, side: str, price: float, size: float):
     """Place a limit order on a Polymarket outcome.
 
     Args:
@@ -421,29 +1382,30 @@ def place_bet(token_id: str, side: str, price: float, size: float):
     Returns:
         Order confirmation or error message.
     """
-    if clob_client is None:
-        return "Trading not configured. Set POLYMARKET_PRIVATE_KEY."
+    clob = await _get_clob()
+    if clob is None:
+        return _TRADING_NOT_CONFIGURED
+    order_side = _ORDER_SIDES.get(side.upper())
+    if order_side is None:
+        return _dumps({"error": 'side must be "BUY" or "SELL"'})
     try:
-        from py_clob_client.order_builder.constants import BUY, SELL
-
-        order_side = BUY if side.upper() == "BUY" else SELL
-        order = clob_client.create_and_post_order(
+        order = await _clob_call(
+            clob,
+            "create_and_post_order",
             {
                 "token_id": token_id,
                 "price": price,
                 "size": size,
                 "side": order_side,
-            }
-        )
-        return json.dumps(
-            {"status": "placed", "order": order}, indent=2, default=str
+            },
         )
+        return _dumps({"status": "placed", "order": order}, default=str)
     except Exception as e:
-        return json.dumps({"error": str(e)})
+        return _tool_error(e)
 
 
 @tool
-def cancel_order(order_id: str):
+async def cancel_order(order_id: str):
     """Cancel an open order.
 
     Args:
@@ -452,15 +1414,14 @@ def cancel_order(order_id: str):
     Returns:
         Cancellation confirmation or error message.
     """
-    if clob_client is None:
-        return "Trading not configured. Set POLYMARKET_PRIVATE_KEY."
+    clob = await _get_clob()
+    if clob is None:
+        return _TRADING_NOT_CONFIGURED
     try:
-        result = clob_client.cancel(order_id)
-        return json.dumps(
-            {"status": "cancelled", "result": result}, indent=2, default=str
-        )
+        result = await _clob_call(clob, "cancel", order_id)
+        return _dumps({"status": "cancelled", "result": result}, default=str)
     except Exception as e:
-        return json.dumps({"error": str(e)})
+        return _tool_error(e)
 
 
 # ---------------------------------------------------------------------------
@@ -468,48 +1429,109 @@ def cancel_order(order_id: str):
 # ---------------------------------------------------------------------------
 
 
+_POSITION_COLUMNS = ("market_question", "outcome", "size", "avg_price", "current_price")
+
+
+def _compact(obj) -> str:
+    return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
+def _positions_table(positions: list) -> str:
+    """Render positions as a pipe table, which costs fewer tokens than JSON."""
+    if not all(isinstance(p, dict) for p in positions):
+        return _compact(positions)
+    rows = ["question | outcome | size | avg | cur"]
+    rows.extend(
+        " | ".join(str(p.get(col, "")) for col in _POSITION_COLUMNS)
+        for p in positions
+    )
+    return "\n".join(rows)
+
+
+def _render_state_context(state_dict: dict) -> str:
+    """Render the injected watchlist, positions and wallet fields as prompt text."""
+    parts = []
+    if state_dict.get("markets"):
+        parts.append(f"Current watchlist:\n{_compact(state_dict['markets'])}")
+    if state_dict.get("positions"):
+        parts.append(f"Current positions:\n{_positions_table(state_dict['positions'])}")
+    if state_dict.get("wallet_balance"):
+        parts.append(f"Wallet USDC balance: {state_dict['wallet_balance']}")
+    if state_dict.get("last_action"):
+        parts.append(f"Last action: {state_dict['last_action']}")
+    return "\n\n".join(parts)
+
+
+# Not memoised: AG-UI decodes a fresh state dict every run, so a cache key
+# would have to be built from content. Encoding the state for a key costs
+# about as much as the compact render itself, which is mostly that encoding.
 def build_market_prompt(input_data, user_message: str) -> str:
     """Inject current watchlist and positions into the prompt context."""
     state_dict = getattr(input_data, "state", None)
     if isinstance(state_dict, dict):
-        parts = []
-        if state_dict.get("markets"):
-            parts.append(
-                f"Current watchlist:\n{json.dumps(state_dict['markets'], indent=2)}"
-            )
-        if state_dict.get("positions"):
-            parts.append(
-                f"Current positions:\n{json.dumps(state_dict['positions'], indent=2)}"
-            )
-        if state_dict.get("wallet_balance"):
-            parts.append(f"Wallet USDC balance: {state_dict['wallet_balance']}")
-        if state_dict.get("last_action"):
-            parts.append(f"Last action: {state_dict['last_action']}")
-        if parts:
-            return "\n\n".join(parts) + f"\n\nUser request: {user_message}"
+        rendered = _render_state_context(state_dict)
+        if rendered:
+            return rendered + f"\n\nUser request: {user_message}"
     return user_message
 
 
+# Watchlist score weights: edge dominates, confidence breaks ties
+_SCORE_EDGE_WEIGHT = 0.5
+_SCORE_CONFIDENCE_WEIGHT = 0.3
+
+
+def _rank_markets(markets: list[dict]) -> list[dict]:
+    """Order ``markets`` best first by a score from edge and confidence.
+
+    The sort is stable, so unscored markets (a fresh scan) keep the order the
+    agent sent. The score only orders the list and is not added to the state.
+    """
+
+    def column(key: str) -> np.ndarray:
+        return np.fromiter(
+            (_as_float(m.get(key)) for m in markets),
+            dtype=np.float64,
+            count=len(markets),
+        )
+
+    scores = (
+        _SCORE_EDGE_WEIGHT * column("edge")
+        + _SCORE_CONFIDENCE_WEIGHT * column("confidence")
+    )
+    return [markets[i] for i in np.argsort(-scores, kind="stable").tolist()]
+
+
 async def market_state_from_args(context):
     """Extract market state from update_watchlist tool arguments."""
     try:
         tool_input = context.tool_input
-        if isinstance(tool_input, str):
-            tool_input = json.loads(tool_input)
+        if isinstance(tool_input, (str, bytes)):
+            tool_input = _loads(tool_input)
+        if not isinstance(tool_input, dict):
+            return None
 
         # Handle flat params: {markets: [...], positions: [...], last_action: "..."}
-        if isinstance(tool_input, dict):
-            markets = tool_input.get("markets", [])
-            if isinstance(markets, list):
-                state = {
-                    "markets": markets,
-                    "positions": tool_input.get("positions", []) or [],
-                    "last_action": tool_input.get("last_action", ""),
-                }
-                if tool_input.get("wallet_balance"):
-                    state["wallet_balance"] = tool_input["wallet_balance"]
-                return state
-        return None
+        markets = tool_input.get("markets")
+        if not isinstance(markets, list):
+            return None
+        try:
+            markets = _rank_markets(markets)
+        except (AttributeError, TypeError):
+            pass
+        state = {
+            "markets": markets,
+            "positions": tool_input.get("positions") or [],
+            "last_action": tool_input.get("last_action", ""),
+        }
+        if tool_input.get("wallet_balance"):
+            state["wallet_balance"] = tool_input["wallet_balance"]
+        if state["positions"]:
+            try:
+                soa = PositionsSoA.from_positions(state["positions"])
+                state["total_pnl"] = float(soa.pnl().sum())
+            except (AttributeError, TypeError, ValueError):
+                pass
+        return state
     except Exception:
         return None
 
@@ -528,26 +1550,20 @@ shared_state_config = StrandsAgentConfig(
     },
 )
 
-model = AnthropicModel(
-    client_args={
-        "api_key": os.getenv("MINIMAX_API_KEY", ""),
-        "base_url": "https://api.minimax.io/anthropic",
-    },
-    model_id="MiniMax-M2.5",
-    max_tokens=4096,
-)
-
 system_prompt = """You are Miss Fortune, an autonomous Polymarket trading agent.
 
 CRITICAL RULE: You MUST call update_watchlist after every search or analysis.
 This populates the dashboard. If you skip it, the user sees an empty page.
 
 Your PRIMARY workflow when asked to find opportunities or scan for bets:
-1. Use get_closing_soon_markets to find active markets.
+1. Use get_closing_soon_markets to find active markets (pass sort_by="liquidity"
+   or "volume" to rank by something other than 24h volume, or hours=N to get
+   the markets whose listed end date is within N hours, soonest first).
 2. IMMEDIATELY call update_watchlist with the markets you found, plus
    last_action describing what you did (e.g. "Found 15 active markets").
 3. For each promising market, use exa_research to research the topic — search for recent
-   news, expert analysis, and data that could inform the likely outcome.
+   news, expert analysis, and data that could inform the likely outcome. To research
+   several markets, pass up to 10 queries in one exa_research_batch call.
 4. Synthesize your research into a ranked list of the BEST bets, considering:
    - Current market price vs your estimated true probability (edge)
    - Liquidity and volume (can you actually get filled?)
@@ -563,22 +1579,50 @@ Your PRIMARY workflow when asked to find opportunities or scan for bets:
 
 You also have access to search_markets, get_market_details, get_order_book, and
 get_price_history for deeper analysis. Use these when you need more detail on a
-specific market.
+specific market. When researching several markets or outcome tokens, use
+get_market_details_batch, get_order_books and get_price_histories to fetch them
+all in a single call. When evaluating more than two markets, use research_and_quote
+to get details, research, order books and price history for all of them at once.
 
 You also have get_wallet_balance to check the wallet's USDC balance on Polygon.
-Call it when starting a scan so the dashboard shows the current balance.
+Call it when starting a scan so the dashboard shows the current balance. To check
+several ERC-20 tokens at once, use get_token_balances_batch.
 
 Always explain your reasoning. Be honest about uncertainty. When research is
 conflicting or insufficient, say so and lower your confidence."""
 
+# Anthropic caches the prompt prefix (tools, then system) up to a
+# cache_control breakpoint. Marking the system block caches both, so later
+# turns only pay full price for new messages. strands' AnthropicModel sends
+# system_prompt as a plain string; params are applied after it and take over.
+_CACHED_SYSTEM = [
+    {"type": "text", "text": system_prompt, "cache_control": {"type": "ephemeral"}}
+]
+
+model = AnthropicModel(
+    client_args={
+        "api_key": CFG.minimax_api_key,
+        "base_url": "https://api.minimax.io/anthropic",
+    },
+    model_id="MiniMax-M2.5",
+    max_tokens=4096,
+    params={"system": _CACHED_SYSTEM},
+)
+
 all_tools = [
     get_closing_soon_markets,
     exa_research,
+    exa_research_batch,
     search_markets,
     get_market_details,
+    get_market_details_batch,
     get_order_book,
+    get_order_books,
     get_price_history,
+    get_price_histories,
+    research_and_quote,
     get_wallet_balance,
+    get_token_balances_batch,
     update_watchlist,
     get_positions,
     place_bet,
@@ -598,11 +1642,78 @@ agui_agent = StrandsAgent(
     config=shared_state_config,
 )
 
-agent_path = os.getenv("AGENT_PATH", "/")
-app = create_strands_app(agui_agent, agent_path)
+app = create_strands_app(agui_agent, CFG.agent_path)
+
+
+# Servers and middleboxes drop idle connections well before keepalive_expiry;
+# a light HEAD every 25s keeps the pooled Gamma/CLOB connections open.
+_KEEPALIVE_INTERVAL = 25.0
+_keepalive_task: asyncio.Task | None = None
+
+
+async def _ping_hosts():
+    await asyncio.gather(
+        *(_http.head(host) for host in (GAMMA_API, CLOB_API)),
+        return_exceptions=True,
+    )
+
+
+async def _keepalive_loop():
+    while True:
+        await _ping_hosts()
+        await asyncio.sleep(_KEEPALIVE_INTERVAL)
+
+
+@app.on_event("startup")
+async def _warm_http_client():
+    """Open pooled connections to Gamma and CLOB and keep them warm.
+
+    The first ping runs in the background so an unreachable Polymarket does
+    not hold up server readiness.
+    """
+    global _keepalive_task
+    _keepalive_task = asyncio.create_task(_keepalive_loop())
+
+
+@app.on_event("shutdown")
+async def _close_http_client():
+    if _keepalive_task is not None:
+        _keepalive_task.cancel()
+    await _http.aclose()
+
+
+def _select_event_loop() -> str:
+    """Pick the uvicorn event loop for this host.
+
+    Prefers the io_uring loop from the optional ``uringcore`` extra on Linux
+    5.11+, then uvloop. uvloop has no Windows build, so Windows uses "auto".
+    """
+    if sys.platform == "win32":
+        return "auto"
+    if sys.platform == "linux" and importlib.util.find_spec("uringcore"):
+        try:
+            kernel = tuple(int(p) for p in os.uname().release.split(".")[:2])
+        except ValueError:
+            kernel = (0, 0)
+        if kernel >= (5, 11):
+            return "uringcore:UringEventLoop"
+    return "uvloop"
+
 
 if __name__ == "__main__":
     import uvicorn
 
-    port = int(os.getenv("AGENT_PORT", 8000))
-    uvicorn.run("main:app", host="0.0.0.0", port=port, reload=True)
+    # Reload is for local development only (the npm dev script sets
+    # AGENT_RELOAD); uvicorn ignores workers while reloading. Both need an
+    # import string so child processes can load the app; otherwise serve the
+    # app object rather than importing this module a second time.
+    multiprocess = CFG.reload or CFG.workers > 1
+    uvicorn.run(
+        "main:app" if multiprocess else app,
+        host="0.0.0.0",
+        port=CFG.agent_port,
+        reload=CFG.reload,
+        workers=CFG.workers,
+        loop=_select_event_loop(),
+        http="httptools",
+    )
@@ -2,5 +2,6 @@
 REM Navigate to the agent directory
 cd /d %~dp0\..\agent
 
-REM Run the agent using uv
+REM Run the agent using uv, reloading on code changes
+set AGENT_RELOAD=1
 uv run python main.py
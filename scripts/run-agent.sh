@@ -3,5 +3,5 @@
 # Navigate to the agent directory
 cd "$(dirname "$0")/../agent" || exit 1
 
-# Run the agent using uv
-uv run python main.py
+# Run the agent using uv, reloading on code changes
+AGENT_RELOAD=1 uv run python main.py